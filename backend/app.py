@@ -4,21 +4,29 @@ Flask API server that integrates the college matching prototype
 with the React frontend application.
 """
 
+import time
+_import_started = time.perf_counter()  # first, so every import below is timed
 import os
 import json
+import threading
 from typing import Dict, Any, Optional, List
 from flask import Flask, request, jsonify
 from flask_cors import CORS
 import pandas as pd
 import numpy as np
-import requests
 from dotenv import load_dotenv
 
 # Import the scoring functions from the prototype
 from prototype import (
     rigor_bonus, pct_position, compute_fit, competitiveness, bucket,
-    fetch_scorecard, load_ipeds_admissions, recommend, dataframe_to_json
+    fetch_scorecard, load_ipeds_admissions, recommend, dataframe_to_json,
+    build_unitid_index, join_ipeds, annotate_band_provenance,
+    score_students, top_per_bucket, flatten_top, load_snapshot, RECOMMENDATION_COLS
 )
+from batching import ScoringBatcher
+from lookup_table import RecommendationTable
+
+_import_seconds = time.perf_counter() - _import_started
 
 load_dotenv()
 
@@ -33,20 +41,108 @@ def safe_float_value(value):
 
 # Cache for university data to avoid repeated API calls
 university_cache = None
+university_rows = None  # school_rows(university_cache), built once per dataset version
 last_cache_update = None
+data_lock = threading.Lock()
+
+# Optional IPEDS admissions file with 25th/75th-percentile bands
+IPEDS_CSV = os.environ.get('IPEDS_ADMISSIONS_CSV')
+ipeds_cache = None
+ipeds_unitid_index = None
+ipeds_mtime = None
+ipeds_failed_mtime = None  # version of the file that last failed to load or join
+
+def load_changed_ipeds():
+    """(frame, UNITID index, mtime) when the IPEDS file changed since the last
+    successful join, else None. Nothing is cached here: the caller commits the
+    new state only once the join has succeeded. A version that fails is
+    remembered and retried only once the file changes again."""
+    global ipeds_mtime, ipeds_failed_mtime
+
+    if not IPEDS_CSV:
+        return None
+    try:
+        mtime = os.path.getmtime(IPEDS_CSV)
+    except OSError as e:
+        if ipeds_mtime is None:
+            print(f"IPEDS admissions file not readable: {e}")
+            ipeds_mtime = -1
+        return None
+    if mtime in (ipeds_mtime, ipeds_failed_mtime):
+        return None
+
+    ipeds_failed_mtime = mtime
+    try:
+        ipeds = load_ipeds_admissions(IPEDS_CSV)
+    except Exception as e:
+        print(f"Error loading IPEDS admissions file: {e}")
+        return None
+    if ipeds is None:
+        return None
+    unitid_index = build_unitid_index(ipeds)
+    if unitid_index.empty:
+        # e.g. caught mid-rewrite with only the header written
+        print(f"IPEDS admissions file {IPEDS_CSV} has no usable UNITID rows; keeping previous IPEDS data")
+        return None
+    ipeds_failed_mtime = None
+    return ipeds, unitid_index, mtime
+
+# Optional precomputed recommendation table (built by lookup_table.py)
+RECOMMENDATION_TABLE = os.environ.get('RECOMMENDATION_TABLE')
+serving_table = None  # set while the table matches the dataset
+
+def refresh_serving_table(df):
+    """Serve from the lookup table only while it was built for the current dataset"""
+    global serving_table
+
+    serving_table = None
+    if not RECOMMENDATION_TABLE:
+        return
+    try:
+        table = RecommendationTable(RECOMMENDATION_TABLE)
+    except Exception as e:
+        print(f"Error loading recommendation table: {e}")
+        return
+    if table.matches(df):
+        serving_table = table
+        print(f"Serving on-grid profiles from {RECOMMENDATION_TABLE}")
+    else:
+        print(f"Recommendation table {RECOMMENDATION_TABLE} was built for a different dataset; using live scoring")
+
+def school_rows(df):
+    """JSON-ready recommendation columns for every school, by row position"""
+    cols = [c for c in RECOMMENDATION_COLS if c in df.columns]
+    return dataframe_to_json(df[cols])
 
 def get_university_data():
     """Get university data from College Scorecard API, using cache if available"""
-    global university_cache, last_cache_update
-    
+    with data_lock:
+        return _build_university_data()
+
+def get_serving_data():
+    """(dataset, its school_rows(), lookup table or None), all from one dataset version"""
+    with data_lock:
+        df = _build_university_data()
+        return df, university_rows, serving_table
+
+def _build_university_data():
+    global university_cache, university_rows, last_cache_update, ipeds_cache, ipeds_unitid_index, ipeds_mtime, ipeds_failed_mtime
+
+    df = university_cache
+    scorecard_refreshed = False
     # Use real College Scorecard API with the provided key
-    if university_cache is None:
+    if df is None:
+        scorecard_refreshed = True
         api_key = os.environ.get('COLLEGE_SCORECARD_API_KEY')
-        if api_key:
+        snapshot = os.environ.get('UNIVERSITY_SNAPSHOT')
+        if snapshot:
+            print(f"Loading university data from snapshot {snapshot}")
+            df = load_snapshot(snapshot)
+        elif api_key:
             try:
                 # Fetch diverse universities from different states and types
                 print("Fetching university data from College Scorecard API...")
-                university_cache = fetch_scorecard(
+                df = fetch_scorecard(
                     api_key=api_key,
                     per_page=100,
                     max_pages=2,  # Get about 200 schools for variety
@@ -56,15 +152,50 @@ def get_university_data():
                         "latest.student.size__range": "1000.."  # Reasonable size schools
                     }
                 )
-                print(f"Fetched {len(university_cache)} universities from College Scorecard API")
+                print(f"Fetched {len(df)} universities from College Scorecard API")
             except Exception as e:
                 print(f"Error fetching from College Scorecard API: {e}")
                 print("Falling back to mock data...")
-                university_cache = get_mock_data()
+                df = get_mock_data()
         else:
             print("No College Scorecard API key found, using mock data")
-            university_cache = get_mock_data()
-    
+            df = get_mock_data()
+
+    # Redo the IPEDS join when either source refreshed; the UNITID index is
+    # reused across Scorecard refreshes and rebuilt only when IPEDS reloads.
+    # Request threads read university_cache without the lock, so each join goes
+    # into a shallow copy (no data copied) that replaces it in one swap. A new
+    # IPEDS file is committed only once its join succeeds; a failed version is
+    # retried when the file changes again, not on every request.
+    changed = load_changed_ipeds()
+    if not (scorecard_refreshed or changed):
+        return df
+
+    joined = None
+    if changed is not None:
+        ipeds, unitid_index, mtime = changed
+        try:
+            joined = join_ipeds(df.copy(deep=False), ipeds, unitid_index)
+        except Exception as e:
+            print(f"Error joining IPEDS admissions data: {e}; keeping previous IPEDS data")
+            ipeds_failed_mtime = mtime
+            if not scorecard_refreshed:
+                return df
+        else:
+            ipeds_cache, ipeds_unitid_index, ipeds_mtime = ipeds, unitid_index, mtime
+    if joined is None:
+        if ipeds_cache is not None:
+            joined = join_ipeds(df.copy(deep=False), ipeds_cache, ipeds_unitid_index)
+        else:
+            joined = annotate_band_provenance(df.copy(deep=False))
+    if ipeds_cache is not None:
+        matched = int(joined['ipeds_matched'].sum())
+        print(f"Joined IPEDS bands for {matched}/{len(joined)} universities")
+
+    refresh_serving_table(joined)
+    university_rows = school_rows(joined)
+    university_cache = joined
+    last_cache_update = time.time()
     return university_cache
 
 def get_mock_data():
@@ -146,6 +277,38 @@ def get_mock_data():
     
     return university_cache
 
+# Coalesce concurrent scoring requests over a short window (0 disables)
+SCORING_BATCH_WINDOW_MS = float(os.environ.get('SCORING_BATCH_WINDOW_MS', '0') or 0)
+SCORING_BATCH_MAX = int(os.environ.get('SCORING_BATCH_MAX', '64') or 64)
+scoring_batcher = (ScoringBatcher(get_university_data, SCORING_BATCH_WINDOW_MS, SCORING_BATCH_MAX)
+                   if SCORING_BATCH_WINDOW_MS > 0 else None)
+
+def rank_profile(student, df, max_per_bucket=10):
+    """(positions, scores, buckets) of the student's top schools per bucket in `df`, scored live.
+
+    Batched with concurrent requests if enabled; returns the dataset the
+    positions refer to, which differs from `df` only across a data refresh.
+    """
+    if scoring_batcher is not None and max_per_bucket <= scoring_batcher.top_k:
+        df, positions, scores = scoring_batcher.rank(student, df)
+    else:
+        positions, scores = top_per_bucket(score_students(df, [student]), max_per_bucket)
+        positions, scores = positions[0], scores[0]
+    return df, flatten_top(positions, scores, max_per_bucket)
+
+def recommend_profile(student, max_per_bucket=10):
+    """JSON-ready top schools per bucket: table lookup for on-grid profiles, live scoring otherwise.
+
+    Both paths build the response from the cached per-school JSON rows.
+    """
+    df, rows, table = get_serving_data()
+    hit = table.lookup(student, max_per_bucket) if table is not None else None
+    if hit is None:
+        ranked_df, hit = rank_profile(student, df, max_per_bucket)
+        if ranked_df is not df:
+            rows = school_rows(ranked_df)
+    return [dict(rows[p], score=safe_float_value(float(score)), bucket=str(b)) for p, score, b in zip(*hit)]
+
 
 @app.route('/api/calculate-profile-score', methods=['POST'])
 def calculate_profile_score():
@@ -162,9 +325,6 @@ def calculate_profile_score():
             student_data.get('satMath', 0)
         ) * 100  # Convert to 0-100 scale
         
-        # Get university recommendations
-        df = get_university_data()
-        
         # Use student data in the format expected by our updated functions
         student_profile = {
             "gpa": student_data.get('gpa', 0),
@@ -177,10 +337,7 @@ def calculate_profile_score():
         }
         
         # Get recommendations limited to ~10 schools per bucket
-        recommendations_df = recommend(df, student_profile, max_per_bucket=10)
-        
-        # Convert to list and group by bucket
-        recommendations = recommendations_df.to_dict('records')
+        recommendations = recommend_profile(student_profile, max_per_bucket=10)
         
         # Group recommendations by bucket
         grouped_recommendations = {
@@ -202,6 +359,8 @@ def calculate_profile_score():
                     'satReadingMidpoint': safe_float_value(rec.get('latest.admissions.sat_scores.midpoint.critical_reading', None)),
                     'actMidpoint': safe_float_value(rec.get('latest.admissions.act_scores.midpoint.cumulative', None)),
                     'competitivenessScore': safe_float_value(round((rec.get('score') or 0) * 100, 1)),
+                    'satBandSource': rec.get('sat_band_source'),
+                    'actBandSource': rec.get('act_band_source'),
                     'bucket': bucket
                 }
                 grouped_recommendations[bucket].append(school_data)
@@ -220,9 +379,6 @@ def get_recommendations():
     try:
         student_data = request.json
         
-        # Get university data
-        df = get_university_data()
-        
         # Convert student data to format expected by backend functions
         student = {
             "gpa": student_data.get('gpa', 0),
@@ -235,10 +391,7 @@ def get_recommendations():
         }
         
         # Get recommendations using the backend algorithm
-        recommendations = recommend(df, student, max_per_bucket=10)
-        
-        # Convert to JSON format
-        recs_json = dataframe_to_json(recommendations)
+        recs_json = recommend_profile(student, max_per_bucket=10)
         
         # Calculate summary
         summary = {
@@ -339,6 +492,83 @@ def health_check():
     """Health check endpoint"""
     return jsonify({'status': 'healthy', 'message': 'Backend API is running'})
 
+# ---------------------------
+# Startup prewarm / readiness
+# ---------------------------
+
+PREWARM_ON_START = os.environ.get('PREWARM_ON_START', '').lower() in ('1', 'true', 'yes')
+
+WARMUP_PROFILE = {
+    'gpa': 3.7, 'satEBRW': 650, 'satMath': 670, 'actScore': 30,
+    'toeflScore': 100, 'apCourses': 3, 'ibScore': 0, 'intendedMajor': '',
+}
+
+warmup_state = {
+    'status': 'pending' if PREWARM_ON_START else 'skipped',
+    'timings_ms': {},
+    'error': None,
+}
+
+def _warm_scoring_paths():
+    """Run a dummy profile through every scoring endpoint"""
+    with app.test_client() as client:
+        for path, payload in (
+            ('/api/calculate-profile-score', WARMUP_PROFILE),
+            ('/api/get-recommendations', WARMUP_PROFILE),
+            ('/api/search-schools', {'query': 'university', 'student_data': WARMUP_PROFILE}),
+        ):
+            resp = client.post(path, json=payload)
+            if resp.status_code != 200:
+                raise RuntimeError(f"{path} returned {resp.status_code}: {resp.get_data(as_text=True)}")
+
+def prewarm():
+    """Load the dataset, build derived structures and warm the scoring code paths"""
+    warmup_state['status'] = 'warming'
+    timings = {'imports': round(_import_seconds * 1000, 1)}
+    steps = [
+        ('load_dataset', get_university_data),
+        ('score_dummy_profile', _warm_scoring_paths),
+    ]
+    started = time.perf_counter()
+    try:
+        for name, step in steps:
+            t0 = time.perf_counter()
+            step()
+            timings[name] = round((time.perf_counter() - t0) * 1000, 1)
+    except Exception as e:
+        warmup_state['error'] = str(e)
+        warmup_state['status'] = 'failed'
+        print(f"Prewarm failed: {e}")
+    else:
+        warmup_state['status'] = 'ready'
+    timings['total'] = round((time.perf_counter() - started) * 1000, 1)
+    warmup_state['timings_ms'] = timings
+    print(f"Prewarm {warmup_state['status']} in {timings['total']} ms")
+
+def start_prewarm():
+    """Run prewarm() in a background thread so liveness is answered meanwhile"""
+    threading.Thread(target=prewarm, name='prewarm', daemon=True).start()
+
+@app.route('/api/ready', methods=['GET'])
+def readiness_check():
+    """Readiness endpoint: 503 until startup warmup has completed"""
+    ready = warmup_state['status'] in ('ready', 'skipped')
+    serving = serving_table
+    body = {
+        'status': 'ready' if ready else 'not_ready',
+        'warmup': warmup_state,
+        # Table hits vs live-scoring fallbacks, or None when no table is serving
+        'lookup_table': dict(serving.stats) if serving is not None else None,
+    }
+    return jsonify(body), (200 if ready else 503)
+
+# Under a WSGI server the module is imported, not run; warm the worker here.
+# When run as a script, only the reloader child (which serves) warms up.
+if PREWARM_ON_START and __name__ != '__main__':
+    start_prewarm()
+
 if __name__ == '__main__':
     port = int(os.environ.get('PORT', 5001))
+    if PREWARM_ON_START and os.environ.get('WERKZEUG_RUN_MAIN') == 'true':
+        start_prewarm()
     app.run(host='localhost', port=port, debug=True)
\ No newline at end of file
@@ -0,0 +1,110 @@
+#!/usr/bin/env python3
+"""
+Request coalescing for the scoring endpoints.
+
+Recommendation requests that arrive within a short window are evaluated
+together: one students x schools scoring pass (prototype.score_students) and
+one vectorized per-bucket top-k over the whole score matrix
+(prototype.top_per_bucket). Each waiting request gets back only its own ranked
+school positions. Requests with identical scoring inputs, whether queued or
+already being scored, share one result.
+"""
+
+import threading
+import time
+from concurrent.futures import Future
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+import numpy as np
+import pandas as pd
+
+from prototype import score_students, profile_key, student_inputs, top_per_bucket
+
+Entry = Tuple[Dict[str, Any], Optional[pd.DataFrame], Future]
+
+
+class ScoringBatcher:
+    """Collects concurrent recommendation requests and ranks them in one pass.
+
+    A request waits at most `window_ms` (plus the batch's compute time) before
+    its batch is ranked; a batch is flushed early once `max_batch` distinct
+    profiles are queued. Each result holds the top `top_k` schools per bucket.
+    """
+
+    def __init__(self, dataset_fn: Callable[[], pd.DataFrame],
+                 window_ms: float = 2.0, max_batch: int = 64, top_k: int = 10):
+        self.dataset_fn = dataset_fn
+        self.window = window_ms / 1000.0
+        self.max_batch = max(1, max_batch)
+        self.top_k = top_k
+        self.stats = {'requests': 0, 'batches': 0, 'profiles_scored': 0, 'merged': 0,
+                      'failed_batches': 0}
+        self._cond = threading.Condition()
+        self._pending: Dict[tuple, Entry] = {}
+        self._inflight: Dict[tuple, Future] = {}
+        self._worker = None
+
+    def rank(self, student: Dict[str, Any],
+             df: Optional[pd.DataFrame] = None) -> Tuple[pd.DataFrame, np.ndarray, np.ndarray]:
+        """Return (dataset, positions, scores) for one student, blocking until its batch is ranked.
+
+        positions/scores are the student's top_per_bucket() rows. `df` is the
+        dataset the caller already holds; a batch whose requests all passed the
+        same frame is ranked against it without calling `dataset_fn`.
+        Malformed profiles raise here, in the caller's thread, and never join a batch.
+        """
+        student_inputs(student)
+        key = profile_key(student)
+        with self._cond:
+            self.stats['requests'] += 1
+            fut = self._inflight.get(key)
+            if fut is None and key in self._pending:
+                fut = self._pending[key][2]
+            if fut is not None:
+                self.stats['merged'] += 1
+            else:
+                fut = Future()
+                self._pending[key] = (student, df, fut)
+                if self._worker is None:
+                    self._worker = threading.Thread(target=self._run, name='scoring-batcher', daemon=True)
+                    self._worker.start()
+                self._cond.notify()
+        return fut.result()
+
+    def _run(self):
+        while True:
+            with self._cond:
+                while not self._pending:
+                    self._cond.wait()
+                deadline = time.monotonic() + self.window
+                while len(self._pending) < self.max_batch:
+                    remaining = deadline - time.monotonic()
+                    if remaining <= 0:
+                        break
+                    self._cond.wait(remaining)
+                batch, self._pending = self._pending, {}
+                self._inflight = {key: fut for key, (_, _, fut) in batch.items()}
+            self._flush(list(batch.values()))
+            with self._cond:
+                self._inflight = {}
+
+    def _flush(self, entries: List[Entry]):
+        try:
+            df = entries[0][1]
+            if df is None or any(frame is not df for _, frame, _ in entries):
+                df = self.dataset_fn()
+            positions, scores = top_per_bucket(
+                score_students(df, [student for student, _, _ in entries]), self.top_k)
+        except Exception as e:
+            if len(entries) == 1:
+                entries[0][2].set_exception(e)
+                return
+            # Rank each request on its own so only the failing ones see the error
+            self.stats['failed_batches'] += 1
+            for entry in entries:
+                self._flush([entry])
+            return
+        self.stats['batches'] += 1
+        self.stats['profiles_scored'] += len(entries)
+        for i, (_, _, fut) in enumerate(entries):
+            fut.set_result((df, positions[i], scores[i]))
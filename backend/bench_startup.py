@@ -0,0 +1,93 @@
+#!/usr/bin/env python3
+"""
+bench_startup.py
+
+Startup benchmark for the fast CLI/import path of prototype.py. In fresh
+interpreters it measures, as overhead over a bare `python -c pass`:
+  1) `import prototype`, which must not load numpy, pandas or requests
+  2) a full `prototype.py --snapshot` run against a generated catalog
+
+Exits 1 when a heavy module is imported or a median exceeds its budget, so it
+can gate CI or container builds.
+
+    python bench_startup.py [--runs 15] [--import_budget_ms 50] [--cli_budget_ms 150]
+"""
+
+import argparse
+import json
+import os
+import random
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+HEAVY_MODULES = ["numpy", "pandas", "requests"]
+
+def _median_ms(cmd, runs):
+    times = []
+    for _ in range(runs):
+        t0 = time.perf_counter()
+        subprocess.run(cmd, cwd=HERE, check=True, stdout=subprocess.DEVNULL)
+        times.append((time.perf_counter() - t0) * 1000)
+    return statistics.median(times)
+
+def _write_catalog(path, n=200):
+    rng = random.Random(0)
+    rows = []
+    for i in range(n):
+        m, r = rng.randint(450, 790), rng.randint(450, 790)
+        rows.append({
+            "id": 100000 + i, "school.name": f"School {i}", "school.city": "City", "school.state": "CA",
+            "latest.admissions.admission_rate.overall": round(rng.uniform(0.05, 0.95), 3),
+            "latest.admissions.sat_scores.midpoint.math": m,
+            "latest.admissions.sat_scores.midpoint.critical_reading": r,
+            "latest.admissions.act_scores.midpoint.cumulative": rng.randint(18, 35),
+        })
+    with open(path, "w", encoding="utf-8") as f:
+        json.dump(rows, f)
+
+def main():
+    p = argparse.ArgumentParser(description="Check prototype.py cold-start time against a budget.")
+    p.add_argument("--runs", type=int, default=15, help="Fresh interpreters per measurement")
+    p.add_argument("--import_budget_ms", type=float, default=50.0)
+    p.add_argument("--cli_budget_ms", type=float, default=150.0)
+    args = p.parse_args()
+
+    py = sys.executable
+    failures = []
+
+    probe = ("import json, sys, prototype; "
+             f"print(json.dumps([m for m in {HEAVY_MODULES!r} if m in sys.modules]))")
+    out = subprocess.run([py, "-c", probe], cwd=HERE, check=True, capture_output=True, text=True)
+    loaded = json.loads(out.stdout)
+    if loaded:
+        failures.append(f"`import prototype` loaded {', '.join(loaded)}")
+
+    baseline = _median_ms([py, "-c", "pass"], args.runs)
+    import_ms = _median_ms([py, "-c", "import prototype"], args.runs) - baseline
+
+    with tempfile.TemporaryDirectory() as tmp:
+        catalog = os.path.join(tmp, "catalog.json")
+        _write_catalog(catalog)
+        cli = [py, "prototype.py", "--snapshot", catalog,
+               "--gpa", "3.7", "--sat_ebrw", "650", "--sat_math", "670", "--act", "0",
+               "--toefl", "100", "--ap", "2", "--ib", "0", "--out_json", os.path.join(tmp, "out.json")]
+        cli_ms = _median_ms(cli, args.runs) - baseline
+
+    print(f"python -c pass:           {baseline:7.1f} ms (baseline)")
+    print(f"import prototype:       + {import_ms:7.1f} ms (budget {args.import_budget_ms:.0f} ms)")
+    print(f"prototype.py --snapshot: + {cli_ms:7.1f} ms (budget {args.cli_budget_ms:.0f} ms)")
+
+    if import_ms > args.import_budget_ms:
+        failures.append(f"import overhead {import_ms:.1f} ms exceeds {args.import_budget_ms:.0f} ms")
+    if cli_ms > args.cli_budget_ms:
+        failures.append(f"snapshot CLI overhead {cli_ms:.1f} ms exceeds {args.cli_budget_ms:.0f} ms")
+    for f in failures:
+        print(f"FAIL: {f}", file=sys.stderr)
+    sys.exit(1 if failures else 0)
+
+if __name__ == "__main__":
+    main()
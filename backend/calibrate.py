@@ -0,0 +1,210 @@
+#!/usr/bin/env python3
+"""
+calibrate.py
+
+Offline sweep over the scoring weights and thresholds used by prototype.py:
+  - competitiveness() weights w_fit / w_sel / w_rigor
+  - bucket() cutoffs (Likely / Target)
+  - the GPA penalty coefficient
+
+The per-pair fit, per-school selectivity and per-student rigor components are
+computed once; each configuration only re-combines them. Configurations are
+evaluated in vectorized chunks spread across worker processes.
+
+For every configuration the report lists the share of student/school pairs in
+each bucket, the share of students left without any Likely school, agreement
+with the current hand-tuned buckets, and the share of pairs whose score sits
+within --margin of a cutoff (lower = more stable buckets).
+
+Example:
+    python calibrate.py --students students.csv --catalog schools.csv \\
+        --w_fit 0:1:0.05 --w_sel 0:1:0.05 --likely 0.7,0.75,0.8 --target 0.4,0.45,0.5
+
+Students need the fields the API sends: gpa, satEBRW, satMath, act, apCourses, ibScore.
+"""
+
+import argparse
+import itertools
+import os
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
+from typing import Dict, List, Optional
+
+import numpy as np
+import pandas as pd
+from dotenv import load_dotenv
+
+from prototype import (
+    W_FIT, W_SEL, W_RIGOR, LIKELY_CUTOFF, TARGET_CUTOFF, GPA_PENALTY, GPA_PENALTY_BELOW,
+    fetch_scorecard, load_ipeds_admissions, load_snapshot, join_ipeds,
+    scoring_components, combine_components,
+)
+
+CONFIG_COLS = ["w_fit", "w_sel", "w_rigor", "likely", "target", "gpa_penalty"]
+
+# ---------------------------
+# Sweep core
+# ---------------------------
+
+_shared: Dict[str, np.ndarray] = {}
+
+def prepare_components(comp: Dict[str, np.ndarray]) -> Dict[str, np.ndarray]:
+    """Split components into config-independent float32 terms plus the current buckets."""
+    fit, sel = comp["fit"], comp["sel"][None, :]
+    gpa = comp["gpa"]
+    baseline = combine_components(comp)
+    f32 = np.float32
+    return {
+        "fit0": np.nan_to_num(fit).astype(f32),
+        "has_fit": (~np.isnan(fit)).astype(f32),
+        "sel0": np.nan_to_num(sel).astype(f32),
+        "has_sel": (~np.isnan(sel)).astype(f32),
+        "rigor": comp["rigor"][:, None].astype(f32),
+        "penalty_base": np.where(gpa < GPA_PENALTY_BELOW, (GPA_PENALTY_BELOW - gpa) ** 2, 0.0)[:, None].astype(f32),
+        "baseline": _bucket_codes(baseline, LIKELY_CUTOFF, TARGET_CUTOFF),
+    }
+
+def _bucket_codes(scores: np.ndarray, likely, target) -> np.ndarray:
+    # 0 = Reach, 1 = Target, 2 = Likely
+    return (scores >= target).astype(np.int8) + (scores >= likely).astype(np.int8)
+
+def _init_worker(shared: Dict[str, np.ndarray]):
+    _shared.clear()
+    _shared.update(shared)
+
+def evaluate_configs(configs: np.ndarray, margin: float = 0.02) -> np.ndarray:
+    """Metrics for a chunk of configs (rows of CONFIG_COLS), vectorized over the chunk."""
+    c = _shared
+    w_fit, w_sel, w_rigor, likely, target, pen = (
+        configs[:, i, None, None].astype(np.float32) for i in range(6))
+
+    # Scores are float32: ample for bucket shares, half the memory traffic
+    scores = w_fit * c["fit0"]
+    scores += w_sel * c["sel0"]
+    scores += w_rigor * c["rigor"]
+    scores /= w_fit * c["has_fit"] + w_sel * c["has_sel"] + w_rigor
+    scores -= pen * c["penalty_base"]
+    np.clip(scores, 0, 1, out=scores)
+
+    codes = _bucket_codes(scores, likely, target)
+    pairs = codes.shape[1] * codes.shape[2]
+    is_likely = codes == 2
+    at_least_target = codes >= 1
+    near = np.abs(scores - likely) < margin
+    near |= np.abs(scores - target) < margin
+    pct_likely = is_likely.sum(axis=(1, 2)) / pairs
+    pct_target_up = at_least_target.sum(axis=(1, 2)) / pairs
+    return np.column_stack([
+        pct_likely,
+        pct_target_up - pct_likely,
+        1.0 - pct_target_up,
+        (~is_likely.any(axis=2)).mean(axis=1),
+        (codes == c["baseline"]).sum(axis=(1, 2)) / pairs,
+        near.sum(axis=(1, 2)) / pairs,
+    ])
+
+METRIC_COLS = ["pct_likely", "pct_target", "pct_reach",
+               "students_without_likely", "agreement_with_current", "near_cutoff"]
+
+# Pair-scores per vectorized block; keeps each block's working set cache-sized
+BLOCK_PAIRS = 1 << 20
+
+def sweep(comp: Dict[str, np.ndarray], configs: np.ndarray, workers: Optional[int] = None,
+          chunk: Optional[int] = None, margin: float = 0.02) -> pd.DataFrame:
+    """Evaluate every configuration and return one report row per config."""
+    shared = prepare_components(comp)
+    if not chunk:
+        chunk = max(1, BLOCK_PAIRS // max(1, comp["fit"].size))
+    chunks = [configs[i:i + chunk] for i in range(0, len(configs), chunk)]
+    if workers == 1 or len(chunks) == 1:
+        _init_worker(shared)
+        results = [evaluate_configs(ch, margin) for ch in chunks]
+    else:
+        with ProcessPoolExecutor(max_workers=workers, initializer=_init_worker,
+                                 initargs=(shared,)) as pool:
+            results = list(pool.map(evaluate_configs, chunks, itertools.repeat(margin)))
+    metrics = np.vstack(results) if results else np.empty((0, len(METRIC_COLS)))
+    return pd.concat([pd.DataFrame(configs, columns=CONFIG_COLS),
+                      pd.DataFrame(metrics, columns=METRIC_COLS)], axis=1)
+
+# ---------------------------
+# Config grid
+# ---------------------------
+
+def parse_values(spec: str) -> List[float]:
+    """'0.1,0.2' -> list; 'start:stop:step' -> inclusive range."""
+    if ":" in spec:
+        start, stop, step = (float(v) for v in spec.split(":"))
+        n = int(round((stop - start) / step)) + 1
+        return [round(start + i * step, 10) for i in range(n)]
+    return [float(v) for v in spec.split(",") if v.strip()]
+
+def build_grid(w_fit, w_sel, w_rigor, likely, target, gpa_penalty) -> np.ndarray:
+    grid = np.array(list(itertools.product(w_fit, w_sel, w_rigor, likely, target, gpa_penalty)), dtype=float)
+    if len(grid) == 0:
+        return grid.reshape(0, len(CONFIG_COLS))
+    # Target cutoff must sit below Likely, and rigor must keep the average defined
+    return grid[(grid[:, 4] < grid[:, 3]) & (grid[:, 2] > 0)]
+
+# ---------------------------
+# Main
+# ---------------------------
+
+def main():
+    load_dotenv()
+
+    p = argparse.ArgumentParser(description="Sweep scoring weights and thresholds over a student corpus.")
+    p.add_argument("--students", required=True, help="Student corpus (.csv or .json records)")
+    p.add_argument("--catalog", help="School catalog snapshot (.csv or .json); fetched from Scorecard if omitted")
+    p.add_argument("--api_key", help="College Scorecard API key (or set API_KEY in .env)")
+    p.add_argument("--max_pages", type=int, default=5, help="Scorecard pages to fetch when no --catalog")
+    p.add_argument("--ipeds_csv", help="Path to IPEDS Admissions CSV (optional)")
+    p.add_argument("--w_fit", default=str(W_FIT), help="Values: 'a,b,c' or 'start:stop:step'")
+    p.add_argument("--w_sel", default=str(W_SEL))
+    p.add_argument("--w_rigor", default=str(W_RIGOR))
+    p.add_argument("--likely", default=str(LIKELY_CUTOFF))
+    p.add_argument("--target", default=str(TARGET_CUTOFF))
+    p.add_argument("--gpa_penalty", default=str(GPA_PENALTY))
+    p.add_argument("--margin", type=float, default=0.02, help="Distance from a cutoff counted as unstable")
+    p.add_argument("--workers", type=int, default=None, help="Worker processes (default: all cores)")
+    p.add_argument("--chunk", type=int, default=None, help="Configs per vectorized block (default: sized to the corpus)")
+    p.add_argument("--out_csv", default="calibration.csv", help="Report filename")
+    args = p.parse_args()
+
+    if args.catalog:
+        schools = load_snapshot(args.catalog)
+    else:
+        api_key = args.api_key or os.getenv("API_KEY")
+        if not api_key:
+            print("Error: pass --catalog, or an API key via --api_key / API_KEY in .env", file=sys.stderr)
+            sys.exit(1)
+        schools = fetch_scorecard(api_key=api_key, max_pages=args.max_pages)
+    ipeds = load_ipeds_admissions(args.ipeds_csv)
+    if ipeds is not None:
+        join_ipeds(schools, ipeds)
+
+    students = load_snapshot(args.students)
+    students = students.astype(object).where(students.notna(), None).to_dict("records")
+    if schools.empty or not students:
+        print("Error: empty student corpus or school catalog.", file=sys.stderr)
+        sys.exit(1)
+
+    configs = build_grid(*(parse_values(getattr(args, c)) for c in CONFIG_COLS))
+    print(f"Sweeping {len(configs)} configurations over {len(students)} students x {len(schools)} schools...")
+
+    t0 = time.perf_counter()
+    comp = scoring_components(schools, students)
+    t1 = time.perf_counter()
+    report = sweep(comp, configs, workers=args.workers, chunk=args.chunk, margin=args.margin)
+    t2 = time.perf_counter()
+
+    report.to_csv(args.out_csv, index=False)
+    print(f"Components: {t1 - t0:.2f}s, sweep: {t2 - t1:.2f}s")
+    print(f"Wrote {len(report)} configurations to {args.out_csv}\n")
+    if not report.empty:
+        print("Most stable configurations (fewest pairs near a cutoff):")
+        print(report.sort_values("near_cutoff").head(10).to_string(index=False))
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,295 @@
+#!/usr/bin/env python3
+"""
+lookup_table.py
+
+Precomputed recommendation tables for serving on-grid profiles without scoring.
+
+The inputs competitiveness() depends on reduce to a few discrete axes: GPA,
+SAT total, ACT, and an "extras" code for the rigor-only inputs: AP count (the
+bump caps at 5 courses), IB >= 38, and whether the SAT total also counts toward
+rigor (it does for /api/calculate-profile-score, not for
+/api/get-recommendations, which sends no AP/IB either). For every point of the
+grid the builder stores the top-k schools per bucket against one dataset
+version. The default grid follows the frontend's input resolution (GPA in
+0.01 steps, SAT totals in 10s, every ACT score) over the usual applicant range;
+the --gpa/--sat/--act options trade coverage against file size.
+
+File layout (little-endian):
+    b"RECTBL01" | uint32 header length | JSON header | padding to 64 bytes
+    positions[profiles, buckets, k]  (school row positions, sentinel = max value)
+    scores[profiles, buckets, k]     (float64, exactly the live scores)
+
+Both arrays are memory-mapped on load, so serving touches only the pages of
+the profiles actually looked up.
+
+Build:
+    python lookup_table.py --out recommendations.tbl [--catalog schools.csv] [--gpa 2.5:4:0.01]
+Without --catalog the server's own dataset (same env configuration) is used.
+"""
+
+import argparse
+import hashlib
+import json
+import sys
+import time
+from typing import Any, Dict, List, Optional, Tuple
+
+import numpy as np
+import pandas as pd
+
+from calibrate import parse_values
+from prototype import (
+    SCORING_VERSION, W_FIT, W_SEL, W_RIGOR, LIKELY_CUTOFF, TARGET_CUTOFF, GPA_PENALTY, GPA_PENALTY_BELOW,
+    load_snapshot, load_ipeds_admissions, join_ipeds,
+    score_students, top_per_bucket, BUCKET_ORDER,
+)
+
+MAGIC = b"RECTBL01"
+VERSION = 3  # 1 stored float32 scores; 2 had separate ap/ib/sat_in_rigor axes
+ALIGN = 64
+# Output order of rank_recommendations(); grid profiles never score NaN ("Unknown")
+BUCKETS = BUCKET_ORDER[:3]
+AXES = ["gpa", "sat", "act", "extras"]
+# Student/school pairs scored per build chunk; score_students() keeps several
+# float64 matrices of this size alive at once
+BLOCK_PAIRS = 1 << 20
+
+# Columns read by scoring_components(); the fingerprint covers exactly these
+SCORING_COLS = [
+    "id",
+    "SATMT25", "SATMT75", "SATVR25", "SATVR75", "ACTCM25", "ACTCM75", "ADM_RATE",
+    "latest.admissions.sat_scores.midpoint.math",
+    "latest.admissions.sat_scores.midpoint.critical_reading",
+    "latest.admissions.act_scores.midpoint.cumulative",
+    "latest.admissions.admission_rate.overall",
+]
+
+def dataset_fingerprint(df: pd.DataFrame) -> str:
+    """Identify a dataset version by the values scoring reads, plus the scoring
+    formula version and constants."""
+    h = hashlib.sha256()
+    h.update(json.dumps([len(df), SCORING_VERSION, W_FIT, W_SEL, W_RIGOR,
+                        LIKELY_CUTOFF, TARGET_CUTOFF, GPA_PENALTY, GPA_PENALTY_BELOW]).encode())
+    for col in SCORING_COLS:
+        if col not in df.columns:
+            continue
+        h.update(col.encode())
+        h.update(pd.to_numeric(df[col], errors="coerce").to_numpy(dtype=float).tobytes())
+    return h.hexdigest()
+
+def extras_code(ap: int, ib: int, sat_in_rigor: int) -> int:
+    return 100 * sat_in_rigor + 10 * ap + ib
+
+# Extras the two endpoints can produce: no AP/IB without SAT in rigor, any with it
+EXTRAS = [extras_code(0, 0, 0)] + [extras_code(ap, ib, 1) for ap in range(6) for ib in (0, 1)]
+
+def default_axes() -> Dict[str, List[float]]:
+    # ~3.7M profiles: about 1.1 GB at k=10
+    return {
+        "gpa": [round(2.5 + i * 0.01, 2) for i in range(151)],
+        "sat": [0] + list(range(800, 1601, 10)),
+        "act": [0] + list(range(15, 37)),
+        "extras": EXTRAS,
+    }
+
+def grid_coordinates(student: Dict[str, Any]) -> Optional[Dict[str, float]]:
+    """The student's values on each table axis, read exactly as the scorer reads them."""
+    if not all(isinstance(student.get(f) or 0, (int, float)) for f in ("gpa", "sat_total", "act")):
+        return None
+    try:
+        gpa = student.get("gpa", 0) or 0
+        sat_ebrw = student.get("satEBRW", 0) or 0
+        sat_math = student.get("satMath", 0) or 0
+        sat_total = (sat_ebrw + sat_math) if (sat_ebrw > 0 or sat_math > 0) else student.get("sat_total")
+        sat = sat_total if sat_total is not None and sat_total > 0 else 0
+        sat_rigor = sat_ebrw + sat_math
+        act = student.get("act")
+        act = act if act is not None and act > 0 else 0
+        ap = min(max(int(student.get("apCourses", 0) or 0), 0), 5)
+        ib = int(int(student.get("ibScore", 0) or 0) >= 38)
+    except (TypeError, ValueError):
+        return None
+    if sat_rigor == sat:
+        sat_in_rigor = 1
+    elif sat_rigor == 0:
+        sat_in_rigor = 0
+    else:
+        return None
+    return {"gpa": gpa, "sat": sat, "act": act, "extras": extras_code(ap, ib, sat_in_rigor)}
+
+def _grid_student(gpa, sat, act, extras) -> Dict[str, Any]:
+    # A profile that scores exactly like every student mapping to this grid point
+    sat_in_rigor, ap, ib = extras // 100, extras // 10 % 10, extras % 10
+    student = {"gpa": gpa, "act": act, "apCourses": ap, "ibScore": 38 if ib else 0}
+    if sat_in_rigor:
+        student.update(satEBRW=sat, satMath=0)
+    else:
+        student["sat_total"] = sat
+    return student
+
+# ---------------------------
+# Build
+# ---------------------------
+
+def build_table(df: pd.DataFrame, out_path: str, k: int = 10,
+                axes: Optional[Dict[str, List[float]]] = None, chunk: Optional[int] = None) -> Dict[str, Any]:
+    """Score every grid profile against `df` and write the table to `out_path`.
+
+    `chunk` profiles are scored at a time (default: sized to the catalog).
+    """
+    axes = axes or default_axes()
+    shape = tuple(len(axes[a]) for a in AXES)
+    n_profiles = int(np.prod(shape))
+    n_schools = len(df)
+    pos_dtype = np.dtype("<u2" if n_schools < np.iinfo(np.uint16).max else "<u4")
+    sentinel = np.iinfo(pos_dtype).max
+    if not chunk:
+        chunk = max(1, BLOCK_PAIRS // max(1, n_schools))
+
+    header = {
+        "version": VERSION,
+        "fingerprint": dataset_fingerprint(df),
+        "n_schools": n_schools,
+        "k": k,
+        "buckets": BUCKETS,
+        "axes": axes,
+        "position_dtype": pos_dtype.str,
+        "built_at": time.strftime("%Y-%m-%dT%H:%M:%S"),
+    }
+    header_bytes = json.dumps(header).encode()
+    offset = -(-(len(MAGIC) + 4 + len(header_bytes)) // ALIGN) * ALIGN
+
+    with open(out_path, "wb") as f:
+        f.write(MAGIC)
+        f.write(np.array(len(header_bytes), dtype="<u4").tobytes())
+        f.write(header_bytes)
+        f.write(b"\0" * (offset - f.tell()))
+
+    table_shape = (n_profiles, len(BUCKETS), k)
+    positions = np.memmap(out_path, dtype=pos_dtype, mode="r+", offset=offset, shape=table_shape)
+    scores_off = offset + positions.nbytes
+    scores_out = np.memmap(out_path, dtype="<f8", mode="r+", offset=scores_off, shape=table_shape)
+
+    for start in range(0, n_profiles, chunk):
+        idx = np.arange(start, min(start + chunk, n_profiles))
+        coords = np.unravel_index(idx, shape)
+        students = [_grid_student(*(axes[a][c[i]] for a, c in zip(AXES, coords)))
+                    for i in range(len(idx))]
+        top, top_scores = top_per_bucket(score_students(df, students), k)
+        top, top_scores = top[:, :len(BUCKETS)], top_scores[:, :len(BUCKETS)]
+        valid = top >= 0
+        positions[idx] = np.where(valid, top, sentinel)
+        scores_out[idx] = np.where(valid, top_scores, 0)
+
+    positions.flush()
+    scores_out.flush()
+    del positions, scores_out
+    return header
+
+# ---------------------------
+# Serve
+# ---------------------------
+
+class RecommendationTable:
+    """Memory-mapped table built by build_table()."""
+
+    def __init__(self, path: str):
+        with open(path, "rb") as f:
+            if f.read(len(MAGIC)) != MAGIC:
+                raise ValueError(f"{path} is not a recommendation table")
+            header_len = int(np.frombuffer(f.read(4), dtype="<u4")[0])
+            self.header = json.loads(f.read(header_len))
+        if self.header.get("version") != VERSION:
+            raise ValueError(f"{path} has table format version {self.header.get('version')}, "
+                             f"expected {VERSION}; rebuild it")
+        offset = -(-(len(MAGIC) + 4 + header_len) // ALIGN) * ALIGN
+
+        self.path = path
+        self.k = self.header["k"]
+        self.fingerprint = self.header["fingerprint"]
+        self.axes = {a: np.asarray(self.header["axes"][a], dtype=float) for a in AXES}
+        self.shape = tuple(len(self.axes[a]) for a in AXES)
+        table_shape = (int(np.prod(self.shape)), len(BUCKETS), self.k)
+        pos_dtype = np.dtype(self.header["position_dtype"])
+        self.positions = np.memmap(path, dtype=pos_dtype, mode="r", offset=offset, shape=table_shape)
+        self.scores = np.memmap(path, dtype="<f8", mode="r",
+                                offset=offset + self.positions.nbytes, shape=table_shape)
+        self.sentinel = np.iinfo(pos_dtype).max
+        # Served vs fell back to live scoring; shows whether the grid fits real traffic
+        self.stats = {"hits": 0, "misses": 0}
+
+    def matches(self, df: pd.DataFrame) -> bool:
+        return len(df) == self.header["n_schools"] and dataset_fingerprint(df) == self.fingerprint
+
+    def _profile_index(self, student: Dict[str, Any]) -> Optional[int]:
+        coords = grid_coordinates(student)
+        if coords is None:
+            return None
+        idx = []
+        for a in AXES:
+            axis = self.axes[a]
+            i = int(np.searchsorted(axis, coords[a]))
+            if i >= len(axis) or axis[i] != coords[a]:
+                return None
+            idx.append(i)
+        return int(np.ravel_multi_index(idx, self.shape))
+
+    def lookup(self, student: Dict[str, Any],
+               max_per_bucket: int) -> Optional[Tuple[np.ndarray, np.ndarray, np.ndarray]]:
+        """(positions, scores, buckets) in rank_recommendations() order, or None if off-grid."""
+        p = self._profile_index(student) if max_per_bucket <= self.k else None
+        if p is None:
+            self.stats["misses"] += 1
+            return None
+        self.stats["hits"] += 1
+        pos = np.asarray(self.positions[p, :, :max_per_bucket])
+        valid = pos != self.sentinel
+        scores = self.scores[p, :, :max_per_bucket][valid]
+        buckets = np.repeat(np.array(BUCKETS), valid.sum(axis=1))
+        return pos[valid].astype(np.intp), scores, buckets
+
+# ---------------------------
+# Main
+# ---------------------------
+
+def main():
+    p = argparse.ArgumentParser(description="Precompute top-k recommendations for a grid of profiles.")
+    p.add_argument("--out", required=True, help="Output table file")
+    p.add_argument("--catalog", help="School catalog snapshot (.csv or .json); default: the server's dataset")
+    p.add_argument("--ipeds_csv", help="Path to IPEDS Admissions CSV to join onto --catalog (optional)")
+    p.add_argument("--save_catalog", help="Also write the dataset used to this CSV (serve it via UNIVERSITY_SNAPSHOT)")
+    p.add_argument("--k", type=int, default=10, help="Schools kept per bucket")
+    p.add_argument("--chunk", type=int, default=None, help="Profiles scored per block (default: sized to the catalog)")
+    p.add_argument("--gpa", help="GPA axis: 'a,b,c' or 'start:stop:step' (default: 2.5:4:0.01)")
+    p.add_argument("--sat", help="SAT total axis; include 0 for 'no SAT' (default: 0 plus 800:1600:10)")
+    p.add_argument("--act", help="ACT axis; include 0 for 'no ACT' (default: 0 plus 15:36:1)")
+    args = p.parse_args()
+
+    axes = default_axes()
+    for name in ("gpa", "sat", "act"):
+        spec = getattr(args, name)
+        if spec:
+            axes[name] = sorted(set(parse_values(spec)))
+
+    if args.catalog:
+        df = load_snapshot(args.catalog)
+        ipeds = load_ipeds_admissions(args.ipeds_csv)
+        if ipeds is not None:
+            join_ipeds(df, ipeds)
+    else:
+        from app import get_university_data
+        df = get_university_data()
+    if df.empty:
+        print("Error: empty school catalog.", file=sys.stderr)
+        sys.exit(1)
+    if args.save_catalog:
+        df.to_csv(args.save_catalog, index=False)
+
+    t0 = time.perf_counter()
+    header = build_table(df, args.out, k=args.k, axes=axes, chunk=args.chunk)
+    profiles = int(np.prod([len(v) for v in header["axes"].values()]))
+    print(f"Wrote {profiles} profiles x {len(BUCKETS)} buckets x top-{args.k} "
+          f"for {len(df)} schools to {args.out} in {time.perf_counter() - t0:.1f}s")
+
+if __name__ == "__main__":
+    main()
@@ -13,22 +13,30 @@ Interactive mode:
     Run `python college_match_prototype.py` with no flags to be prompted for inputs.
 Command-line mode:
     Pass flags to skip prompts (see --help).
+Fast start:
+    Pass --snapshot schools.csv|.json to score a saved catalog without a network
+    fetch. Importing this module loads no numpy/pandas/requests; that path only
+    pulls in pandas when an IPEDS file is joined (see bench_startup.py).
 
 Requires:
     pip install pandas numpy requests python-dotenv
 """
 
+from __future__ import annotations
+
 import argparse
+import csv
 import json
 import math
 import os
 import sys
-from typing import Dict, Any, Optional, List
+from typing import TYPE_CHECKING, Dict, Any, Optional, List, Tuple
 
-import numpy as np
-import pandas as pd
-import requests
-from dotenv import load_dotenv
+# numpy, pandas and requests are imported inside the functions that need them,
+# so the scalar scoring core and the --snapshot CLI path start without them.
+if TYPE_CHECKING:
+    import numpy as np
+    import pandas as pd
 
 SCORECARD_BASE = "https://api.data.gov/ed/collegescorecard/v1/schools"
 
@@ -53,6 +61,8 @@ def fetch_scorecard(api_key: str, per_page: int = 100, max_pages: Optional[int]
                     degree_predominant_in: str = "2,3",
                     extra_filters: Optional[Dict[str, Any]] = None) -> pd.DataFrame:
     """Fetch rows from the Scorecard schools endpoint and return a DataFrame."""
+    import pandas as pd
+    import requests
     params = {
         "api_key": api_key,
         "fields": ",".join(SCORECARD_FIELDS),
@@ -85,6 +95,49 @@ def fetch_scorecard(api_key: str, per_page: int = 100, max_pages: Optional[int]
     df = pd.DataFrame(rows)
     return df
 
+# ---------------------------
+# Ingest: local snapshot
+# ---------------------------
+
+def load_snapshot(path: str) -> pd.DataFrame:
+    """Load a saved table (school catalog, student corpus) from .csv or .json records."""
+    import pandas as pd
+    if path.lower().endswith(".json"):
+        with open(path, encoding="utf-8") as f:
+            data = json.load(f)
+        if isinstance(data, dict):
+            data = data.get("results", [])  # raw Scorecard API page
+        return pd.DataFrame(data)
+    return pd.read_csv(path, low_memory=False, float_precision="round_trip")
+
+def _parse_cell(v: str):
+    if v == "":
+        return None
+    for cast in (int, float):
+        try:
+            return cast(v)
+        except ValueError:
+            pass
+    return v
+
+def _as_number(v) -> Optional[float]:
+    # Numeric value of a snapshot cell or CLI string; None when missing or non-numeric
+    if _isna(v):
+        return None
+    try:
+        return float(v)
+    except (TypeError, ValueError):
+        return None
+
+def load_snapshot_records(path: str) -> List[Dict[str, Any]]:
+    """load_snapshot() as plain dict records, using only the standard library."""
+    if path.lower().endswith(".json"):
+        with open(path, encoding="utf-8") as f:
+            data = json.load(f)
+        return data.get("results", []) if isinstance(data, dict) else data
+    with open(path, newline="", encoding="utf-8") as f:
+        return [{k: _parse_cell(v) for k, v in row.items()} for row in csv.DictReader(f)]
+
 # ---------------------------
 # Ingest: IPEDS CSV (Admissions)
 # ---------------------------
@@ -98,6 +151,7 @@ IPED_ADM_COLS = [
 def load_ipeds_admissions(csv_path: Optional[str]) -> Optional[pd.DataFrame]:
     if not csv_path:
         return None
+    import pandas as pd
     adm = pd.read_csv(csv_path, low_memory=False)
     keep = [c for c in IPED_ADM_COLS if c in adm.columns]
     if "UNITID" not in keep:
@@ -106,18 +160,130 @@ def load_ipeds_admissions(csv_path: Optional[str]) -> Optional[pd.DataFrame]:
     adm = adm[keep].drop_duplicates("UNITID")
     return adm
 
+# ---------------------------
+# Join: Scorecard <- IPEDS
+# ---------------------------
+
+def build_unitid_index(ipeds: pd.DataFrame) -> pd.Series:
+    """Map IPEDS UNITID -> row position. Rebuild only when the IPEDS file changes.
+
+    Non-numeric and repeated UNITIDs are left out, so the index is always unique.
+    """
+    import numpy as np
+    import pandas as pd
+    unitid = pd.to_numeric(ipeds["UNITID"], errors="coerce").to_numpy(dtype=float)
+    keep = ~np.isnan(unitid) & ~pd.Index(unitid).duplicated()
+    return pd.Series(np.flatnonzero(keep), index=pd.Index(unitid[keep]))
+
+def join_ipeds(sc: pd.DataFrame, ipeds: pd.DataFrame,
+               unitid_index: Optional[pd.Series] = None) -> pd.DataFrame:
+    """Attach IPEDS admissions columns to a Scorecard frame in place (no frame copy).
+
+    Rows are matched on Scorecard `id` == IPEDS `UNITID` through `unitid_index`.
+    Matched rows take the IPEDS values; unmatched rows keep whatever band data
+    they already carry, except values left over from an earlier IPEDS join.
+    Safe to call again whenever either source refreshes.
+    """
+    import numpy as np
+    import pandas as pd
+    if unitid_index is None:
+        unitid_index = build_unitid_index(ipeds)
+    found = unitid_index.index.get_indexer(pd.to_numeric(sc["id"], errors="coerce"))
+    hit = found >= 0
+    # Misses (-1) read an arbitrary row and are masked out below
+    pos = unitid_index.to_numpy()[found] if len(unitid_index) else found
+    prev_hit = (sc["ipeds_matched"].to_numpy(dtype=bool)
+                if "ipeds_matched" in sc.columns else np.zeros(len(sc), dtype=bool))
+
+    for col in IPED_ADM_COLS:
+        if col == "UNITID" or (col not in ipeds.columns and col not in sc.columns):
+            continue
+        if col in ipeds.columns and len(ipeds):
+            vals = pd.to_numeric(ipeds[col], errors="coerce").to_numpy(dtype=float)[pos]
+        else:
+            vals = np.full(len(sc), np.nan)
+        if col in sc.columns:
+            old = pd.to_numeric(sc[col], errors="coerce").to_numpy(dtype=float)
+            old = np.where(prev_hit, np.nan, old)
+        else:
+            old = np.full(len(sc), np.nan)
+        sc[col] = np.where(hit, vals, old)
+
+    sc["ipeds_matched"] = hit
+    annotate_band_provenance(sc)
+    return sc
+
+def annotate_band_provenance(df: pd.DataFrame) -> pd.DataFrame:
+    """Record which band compute_fit will use per school: "ipeds", "scorecard" or None."""
+    import numpy as np
+    def has(*cols):
+        mask = np.ones(len(df), dtype=bool)
+        for c in cols:
+            if c not in df.columns:
+                return np.zeros(len(df), dtype=bool)
+            mask &= df[c].notna().to_numpy()
+        return mask
+
+    sat_ipeds = has("SATMT25", "SATMT75", "SATVR25", "SATVR75")
+    sat_sc = has("latest.admissions.sat_scores.midpoint.math",
+                 "latest.admissions.sat_scores.midpoint.critical_reading")
+    act_ipeds = has("ACTCM25", "ACTCM75")
+    act_sc = has("latest.admissions.act_scores.midpoint.cumulative")
+
+    df["sat_band_source"] = np.where(sat_ipeds, "ipeds", np.where(sat_sc, "scorecard", None))
+    df["act_band_source"] = np.where(act_ipeds, "ipeds", np.where(act_sc, "scorecard", None))
+    return df
+
+def annotate_record_provenance(rec: Dict[str, Any]) -> Dict[str, Any]:
+    """annotate_band_provenance() for one plain dict record."""
+    def has(*cols):
+        return all(not _isna(rec.get(c)) for c in cols)
+
+    sat_sc = has("latest.admissions.sat_scores.midpoint.math",
+                 "latest.admissions.sat_scores.midpoint.critical_reading")
+    act_sc = has("latest.admissions.act_scores.midpoint.cumulative")
+    rec["sat_band_source"] = ("ipeds" if has("SATMT25", "SATMT75", "SATVR25", "SATVR75")
+                              else "scorecard" if sat_sc else None)
+    rec["act_band_source"] = ("ipeds" if has("ACTCM25", "ACTCM75")
+                              else "scorecard" if act_sc else None)
+    return rec
+
 # ---------------------------
 # Scoring
 # ---------------------------
 
+# Hand-tuned scoring constants (see calibrate.py for sweeping them)
+W_FIT = 0.25
+W_SEL = 0.25
+W_RIGOR = 0.5
+LIKELY_CUTOFF = 0.75
+TARGET_CUTOFF = 0.45
+GPA_PENALTY_BELOW = 3.0
+GPA_PENALTY = 0.2
+# Bump whenever the scoring formula itself changes (rigor_bonus, compute_fit
+# or their vectorized forms in scoring_components); precomputed lookup tables
+# are keyed on it and stop matching.
+SCORING_VERSION = 1
+
+def _isna(v) -> bool:
+    # Scalar pd.isna without pandas: None or NaN (the only value unequal to itself)
+    try:
+        return v is None or bool(v != v)
+    except TypeError:  # pd.NA
+        return True
+
+def _clip(x, lo, hi):
+    return min(max(x, lo), hi)
+
 def rigor_bonus(gpa: float, ap: int, ib: int, sat_ebrw: Optional[int] = None, sat_math: Optional[int] = None) -> float:
     # Comprehensive rigor score (0..1) including GPA, SAT, AP, and IB
+    # (changing any coefficient here requires bumping SCORING_VERSION)
     # Core academic components (normalized to 0-1)
-    gpa_norm = np.clip((gpa or 0) / 4.0, 0, 1)
+    gpa_norm = _clip((gpa or 0) / 4.0, 0, 1)
     
     # SAT component (combined EBRW + Math, normalized to 0-1)
     sat_total = (sat_ebrw or 0) + (sat_math or 0)
-    sat_norm = np.clip(sat_total / 1600.0, 0, 1)
+    sat_norm = _clip(sat_total / 1600.0, 0, 1)
     # Bonus components
     ap_bump = min(max(ap or 0, 0) * 0.02, 0.10)  # AP bump capped at +0.10
     if ib is not None and ib >= 38:
@@ -127,14 +293,15 @@ def rigor_bonus(gpa: float, ap: int, ib: int, sat_ebrw: Optional[int] = None, sa
     
     # Calculate the comprehensive score - give GPA even more weight
     score = (0.75 * gpa_norm) + (0.15 * sat_norm) + ap_bump + ib_bump
-    return float(np.clip(score, 0, 1))
+    return float(_clip(score, 0, 1))
 
 def pct_position(x: float, lo: float, hi: float) -> Optional[float]:
-    if any(pd.isna(v) for v in [x, lo, hi]) or hi <= lo:
+    if any(_isna(v) for v in [x, lo, hi]) or hi <= lo:
         return None
-    return float(np.clip((x - lo) / (hi - lo), 0, 1))
+    return float(_clip((x - lo) / (hi - lo), 0, 1))
 
 def compute_fit(student: Dict[str, Any], row: pd.Series) -> Optional[float]:
+    # The band fallbacks below are part of the formula: bump SCORING_VERSION on change
     # Combine SAT scores if provided separately
     sat_ebrw = student.get("satEBRW", 0) or 0
     sat_math = student.get("satMath", 0) or 0
@@ -146,8 +313,8 @@ def compute_fit(student: Dict[str, Any], row: pd.Series) -> Optional[float]:
     ACT25, ACT75 = row.get("ACTCM25"), row.get("ACTCM75")
 
     # Prefer IPEDS 25/75 SAT band
-    if (pd.notna(SATMT25) and pd.notna(SATMT75) and pd.notna(SATVR25) and 
-        pd.notna(SATVR75) and sat_total is not None and sat_total > 0):
+    if (not _isna(SATMT25) and not _isna(SATMT75) and not _isna(SATVR25) and 
+        not _isna(SATVR75) and sat_total is not None and sat_total > 0):
         lo = SATMT25 + SATVR25
         hi = SATMT75 + SATVR75
         return pct_position(sat_total, lo, hi)
@@ -155,19 +322,19 @@ def compute_fit(student: Dict[str, Any], row: pd.Series) -> Optional[float]:
     # Fall back to Scorecard SAT midpoints (approx band ±100)
     sc_sat_m = row.get("latest.admissions.sat_scores.midpoint.math")
     sc_sat_r = row.get("latest.admissions.sat_scores.midpoint.critical_reading")
-    if pd.notna(sc_sat_m) and pd.notna(sc_sat_r) and sat_total is not None and sat_total > 0:
+    if not _isna(sc_sat_m) and not _isna(sc_sat_r) and sat_total is not None and sat_total > 0:
         mid_total = sc_sat_m + sc_sat_r  # already total scores, don't multiply by 10
         lo = mid_total - 100
         hi = mid_total + 100
         return pct_position(sat_total, lo, hi)
 
     # ACT fallback (IPEDS 25/75)
-    if pd.notna(ACT25) and pd.notna(ACT75) and act is not None and act > 0:
+    if not _isna(ACT25) and not _isna(ACT75) and act is not None and act > 0:
         return pct_position(act, ACT25, ACT75)
 
     # Scorecard ACT midpoint fallback (±2)
     sc_act_mid = row.get("latest.admissions.act_scores.midpoint.cumulative")
-    if pd.notna(sc_act_mid) and act is not None and act > 0:
+    if not _isna(sc_act_mid) and act is not None and act > 0:
         lo = sc_act_mid - 2
         hi = sc_act_mid + 2
         return pct_position(act, lo, hi)
@@ -175,12 +342,12 @@ def compute_fit(student: Dict[str, Any], row: pd.Series) -> Optional[float]:
     return None
 
 def competitiveness(student: Dict[str, Any], row: pd.Series,
-                    w_fit=0.25, w_sel=0.25, w_rigor=0.5) -> Optional[float]:
+                    w_fit=W_FIT, w_sel=W_SEL, w_rigor=W_RIGOR) -> Optional[float]:
     fit = compute_fit(student, row)
     adm_rate = row.get("latest.admissions.admission_rate.overall")
-    if pd.isna(adm_rate) and "ADM_RATE" in row:
+    if _isna(adm_rate) and "ADM_RATE" in row:
         adm_rate = row.get("ADM_RATE")
-    sel = None if pd.isna(adm_rate) else float(np.clip(adm_rate, 0, 1))  # Higher admission rate = easier = higher score
+    sel = None if _isna(adm_rate) else float(_clip(adm_rate, 0, 1))  # Higher admission rate = easier = higher score
     rigor = rigor_bonus(
         student.get("gpa", 0) or 0, 
         int(student.get("apCourses", 0) or 0), 
@@ -200,54 +367,240 @@ def competitiveness(student: Dict[str, Any], row: pd.Series,
     if not pieces:
         return None
 
-    score = float(np.average(pieces, weights=weights))
+    score = float(sum(p * w for p, w in zip(pieces, weights)) / sum(weights))
     
     # Apply extremely harsh GPA penalty - elite schools absolutely require strong GPAs
     gpa = student.get("gpa", 0) or 0
-    if gpa < 3.0:
+    if gpa < GPA_PENALTY_BELOW:
         # Exponential penalty: 2.0 GPA gets ~0.8 penalty, 2.5 gets ~0.5 penalty  
-        gpa_penalty = (3.0 - gpa) ** 2 * 0.2
+        gpa_penalty = (GPA_PENALTY_BELOW - gpa) ** 2 * GPA_PENALTY
         score = score - gpa_penalty  # Remove floor now that selectivity is fixed
-    return float(np.clip(score, 0, 1))
+    return float(_clip(score, 0, 1))
 
 def bucket(score: Optional[float]) -> str:
-    if score is None or pd.isna(score):
+    if _isna(score):
         return "Unknown"
-    if score >= 0.75:
+    if score >= LIKELY_CUTOFF:
         return "Likely"
-    if score >= 0.45:
+    if score >= TARGET_CUTOFF:
         return "Target"
     return "Reach"
 
+# ---------------------------
+# Vectorized scoring (students x schools)
+# ---------------------------
+
+# Student fields that influence competitiveness(); profiles equal on these score identically
+SCORING_INPUTS = ("gpa", "satEBRW", "satMath", "sat_total", "act", "apCourses", "ibScore")
+
+def profile_key(student: Dict[str, Any]) -> tuple:
+    return tuple(student.get(k) for k in SCORING_INPUTS)
+
+def _numeric_col(df: pd.DataFrame, col: str) -> np.ndarray:
+    import numpy as np
+    import pandas as pd
+    if col not in df.columns:
+        return np.full(len(df), np.nan)
+    return pd.to_numeric(df[col], errors="coerce").to_numpy(dtype=float)
+
+def _pct_matrix(x: np.ndarray, lo: np.ndarray, hi: np.ndarray) -> np.ndarray:
+    import numpy as np
+    # Broadcasting pct_position(): NaN where the band is empty or inverted
+    with np.errstate(invalid="ignore", divide="ignore"):
+        pos = np.clip((x - lo) / (hi - lo), 0, 1)
+    return np.where(hi > lo, pos, np.nan)
+
+def student_inputs(student: Dict[str, Any]) -> Tuple[float, float, float, float]:
+    """Per-student scoring inputs (sat, act, rigor, gpa), read exactly as compute_fit /
+    competitiveness do; sat and act are NaN when not given. Raises on malformed profiles."""
+    sat_ebrw = student.get("satEBRW", 0) or 0
+    sat_math = student.get("satMath", 0) or 0
+    sat_total = (sat_ebrw + sat_math) if (sat_ebrw > 0 or sat_math > 0) else student.get("sat_total")
+    act = student.get("act")
+    rigor = rigor_bonus(
+        student.get("gpa", 0) or 0,
+        int(student.get("apCourses", 0) or 0),
+        int(student.get("ibScore", 0) or 0),
+        student.get("satEBRW", 0),
+        student.get("satMath", 0)
+    )
+    return (float(sat_total) if sat_total is not None and sat_total > 0 else math.nan,
+            float(act) if act is not None and act > 0 else math.nan,
+            rigor,
+            float(student.get("gpa", 0) or 0))
+
+def scoring_components(df: pd.DataFrame, students: List[Dict[str, Any]]) -> Dict[str, np.ndarray]:
+    """Weight-independent pieces of competitiveness() for every student/school pair.
+
+    Returns fit (students x schools, NaN when compute_fit gives None),
+    sel (schools, NaN when unknown), rigor and gpa (students). Keep in step
+    with rigor_bonus()/compute_fit() and bump SCORING_VERSION on change.
+    """
+    import numpy as np
+    inputs = np.array([student_inputs(student) for student in students], dtype=float).reshape(-1, 4)
+    sat, act, rigor, gpa = inputs.T
+    sat = sat[:, None]
+    act = np.asarray(act, dtype=float)[:, None]
+    has_sat, has_act = ~np.isnan(sat), ~np.isnan(act)
+
+    # Per-school bands, in compute_fit's order of preference
+    sat_lo = _numeric_col(df, "SATMT25") + _numeric_col(df, "SATVR25")
+    sat_hi = _numeric_col(df, "SATMT75") + _numeric_col(df, "SATVR75")
+    sc_sat = (_numeric_col(df, "latest.admissions.sat_scores.midpoint.math")
+              + _numeric_col(df, "latest.admissions.sat_scores.midpoint.critical_reading"))
+    act_lo, act_hi = _numeric_col(df, "ACTCM25"), _numeric_col(df, "ACTCM75")
+    sc_act = _numeric_col(df, "latest.admissions.act_scores.midpoint.cumulative")
+
+    use_ipeds_sat = has_sat & ~np.isnan(sat_lo) & ~np.isnan(sat_hi)
+    use_sc_sat = ~use_ipeds_sat & has_sat & ~np.isnan(sc_sat)
+    use_ipeds_act = ~use_ipeds_sat & ~use_sc_sat & has_act & ~np.isnan(act_lo) & ~np.isnan(act_hi)
+    use_sc_act = ~use_ipeds_sat & ~use_sc_sat & ~use_ipeds_act & has_act & ~np.isnan(sc_act)
+
+    fit = np.select(
+        [use_ipeds_sat, use_sc_sat, use_ipeds_act, use_sc_act],
+        [_pct_matrix(sat, sat_lo, sat_hi),
+         _pct_matrix(sat, sc_sat - 100, sc_sat + 100),
+         _pct_matrix(act, act_lo, act_hi),
+         _pct_matrix(act, sc_act - 2, sc_act + 2)],
+        default=np.nan,
+    )
+
+    adm = _numeric_col(df, "latest.admissions.admission_rate.overall")
+    if "ADM_RATE" in df.columns:
+        adm = np.where(np.isnan(adm), _numeric_col(df, "ADM_RATE"), adm)
+
+    return {
+        "fit": fit,
+        "sel": np.clip(adm, 0, 1),
+        "rigor": rigor,
+        "gpa": gpa,
+    }
+
+def combine_components(comp: Dict[str, np.ndarray],
+                       w_fit=W_FIT, w_sel=W_SEL, w_rigor=W_RIGOR,
+                       gpa_penalty=GPA_PENALTY) -> np.ndarray:
+    """Same arithmetic as competitiveness(), over the students x schools matrix."""
+    import numpy as np
+    fit, sel = comp["fit"], comp["sel"][None, :]
+    has_fit, has_sel = ~np.isnan(fit), ~np.isnan(sel)
+    num = (np.where(has_fit, w_fit * fit, 0.0) + np.where(has_sel, w_sel * sel, 0.0)
+           + w_rigor * comp["rigor"][:, None])
+    den = np.where(has_fit, w_fit, 0.0) + np.where(has_sel, w_sel, 0.0) + w_rigor
+    score = num / den
+
+    gpa = comp["gpa"]
+    penalty = np.where(gpa < GPA_PENALTY_BELOW, (GPA_PENALTY_BELOW - gpa) ** 2 * gpa_penalty, 0.0)
+    return np.clip(score - penalty[:, None], 0, 1)
+
+def score_students(df: pd.DataFrame, students: List[Dict[str, Any]],
+                   w_fit=W_FIT, w_sel=W_SEL, w_rigor=W_RIGOR) -> np.ndarray:
+    """competitiveness() for every student (rows) against every school (columns)."""
+    return combine_components(scoring_components(df, students), w_fit, w_sel, w_rigor)
+
+def bucket_array(scores: np.ndarray) -> np.ndarray:
+    import numpy as np
+    return np.select([np.isnan(scores), scores >= LIKELY_CUTOFF, scores >= TARGET_CUTOFF],
+                     ["Unknown", "Likely", "Target"], default="Reach")
+
 # ---------------------------
 # Recommendation pipeline
 # ---------------------------
 
+RECOMMENDATION_COLS = [
+    "school.name","school.city","school.state","latest.student.size",
+    "latest.admissions.admission_rate.overall",
+    "ADM_RATE",
+    "SATVR25","SATVR75","SATMT25","SATMT75","ACTCM25","ACTCM75",
+    "latest.admissions.sat_scores.midpoint.math",
+    "latest.admissions.sat_scores.midpoint.critical_reading",
+    "latest.admissions.act_scores.midpoint.cumulative",
+    "latest.cost.tuition.in_state","latest.cost.tuition.out_of_state",
+    "school.school_url",
+    "sat_band_source","act_band_source",
+    "score","bucket","id"
+]
+
+def rank_recommendations(df: pd.DataFrame, scores: np.ndarray,
+                         max_per_bucket: int = 15) -> pd.DataFrame:
+    """Top schools per bucket for one row of score_students(), best score first."""
+    import numpy as np
+    buckets = bucket_array(scores)
+    # Stable: bucket name ascending, then score descending, ties in catalog order
+    order = np.lexsort((-scores, buckets))
+    sorted_buckets = buckets[order]
+    starts = np.flatnonzero(np.r_[True, sorted_buckets[1:] != sorted_buckets[:-1]])
+    rank = np.arange(len(order)) - np.repeat(starts, np.diff(np.r_[starts, len(order)]))
+    picked = order[rank < max_per_bucket]
+
+    work = df.iloc[picked].assign(score=scores[picked], bucket=buckets[picked])
+    keep = [c for c in RECOMMENDATION_COLS if c in work.columns]
+    return work[keep]
+
+# Bucket order of rank_recommendations() output: bucket names ascending
+BUCKET_ORDER = ["Likely", "Reach", "Target", "Unknown"]
+
+def top_per_bucket(scores: np.ndarray, k: int) -> Tuple[np.ndarray, np.ndarray]:
+    """rank_recommendations() for every row of a students x schools score matrix.
+
+    Returns school positions and scores, each (students, len(BUCKET_ORDER), k) in
+    the same order; slots past the end of a bucket hold -1 and NaN.
+    """
+    import numpy as np
+    scores = np.atleast_2d(scores)
+    n, n_buckets = scores.shape[0], len(BUCKET_ORDER)
+    # Bucket codes in BUCKET_ORDER positions
+    codes = np.select([np.isnan(scores), scores >= LIKELY_CUTOFF, scores >= TARGET_CUTOFF],
+                      [3, 0, 2], default=1)
+    # One stable sort per row: bucket, then best score first, ties in catalog order
+    order = np.lexsort((-np.nan_to_num(scores), codes), axis=-1)
+
+    # Each bucket is a contiguous run of `order`; take the first k of every run
+    counts = np.stack([(codes == b).sum(axis=1) for b in range(n_buckets)], axis=1)
+    starts = np.cumsum(counts, axis=1) - counts
+    rank = np.arange(k)
+    valid = rank < counts[:, :, None]
+    if scores.shape[1] == 0:
+        return np.full(valid.shape, -1), np.full(valid.shape, np.nan)
+    slots = np.where(valid, starts[:, :, None] + rank, 0).reshape(n, n_buckets * k)
+    positions = np.take_along_axis(order, slots, axis=1).reshape(n, n_buckets, k)
+    top_scores = np.take_along_axis(scores, positions.reshape(n, n_buckets * k), axis=1).reshape(n, n_buckets, k)
+    return np.where(valid, positions, -1), np.where(valid, top_scores, np.nan)
+
+def flatten_top(positions: np.ndarray, scores: np.ndarray,
+                max_per_bucket: int) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """One student's top_per_bucket() rows as flat (positions, scores, buckets) in rank order."""
+    import numpy as np
+    positions = positions[:, :max_per_bucket]
+    valid = positions >= 0
+    buckets = np.repeat(np.array(BUCKET_ORDER), valid.sum(axis=1))
+    return positions[valid], scores[:, :max_per_bucket][valid], buckets
+
 def recommend(df: pd.DataFrame, student: Dict[str, Any],
               toefl_min: Optional[int] = None,
               max_per_bucket: int = 15) -> pd.DataFrame:
-    work = df.copy()
-
-    # Compute score & bucket
-    work["score"] = work.apply(lambda r: competitiveness(student, r), axis=1)
-    work["bucket"] = work["score"].apply(bucket)
-
-    work = work.sort_values(["bucket", "score"], ascending=[True, False])
-
-    cols = [
-        "school.name","school.city","school.state","latest.student.size",
-        "latest.admissions.admission_rate.overall",
-        "ADM_RATE",
-        "SATVR25","SATVR75","SATMT25","SATMT75","ACTCM25","ACTCM75",
-        "latest.admissions.sat_scores.midpoint.math",
-        "latest.admissions.sat_scores.midpoint.critical_reading",
-        "latest.admissions.act_scores.midpoint.cumulative",
-        "latest.cost.tuition.in_state","latest.cost.tuition.out_of_state",
-        "school.school_url",
-        "score","bucket","id"
-    ]
-    keep = [c for c in cols if c in work.columns]
-    top = work.groupby("bucket", group_keys=False).head(max_per_bucket)[keep]
+    scores = score_students(df, [student])[0]
+    return rank_recommendations(df, scores, max_per_bucket)
+
+def recommend_records(records: List[Dict[str, Any]], student: Dict[str, Any],
+                      max_per_bucket: int = 15) -> List[Dict[str, Any]]:
+    """recommend() over plain dict records with the pure-Python scorer (no numpy/pandas)."""
+    scored = []
+    for rec in records:
+        score = competitiveness(student, rec)
+        scored.append((bucket(score), score, rec))
+    # Bucket name ascending, then score descending; sort is stable like recommend()
+    scored.sort(key=lambda t: (t[0], math.inf if _isna(t[1]) else -t[1]))
+
+    present = set().union(*records) if records else set()
+    keep = [c for c in RECOMMENDATION_COLS if c in present or c in ("score", "bucket")]
+    counts: Dict[str, int] = {}
+    top = []
+    for b, score, rec in scored:
+        counts[b] = counts.get(b, 0) + 1
+        if counts[b] > max_per_bucket:
+            continue
+        row = dict(rec, score=score, bucket=b)
+        top.append({c: (None if _isna(row.get(c)) else row.get(c)) for c in keep})
     return top
 
 # ---------------------------
@@ -286,6 +639,7 @@ def _prompt_int(label: str, default: Optional[int] = None, required: bool = Fals
 
 def dataframe_to_json(df: pd.DataFrame) -> List[Dict[str, Any]]:
     """Convert DataFrame to JSON-serializable list of dictionaries."""
+    import numpy as np
     # Replace NaN values with None for JSON serialization
     df_clean = df.replace({np.nan: None})
     
@@ -312,6 +666,7 @@ def dataframe_to_json(df: pd.DataFrame) -> List[Dict[str, Any]]:
 # ---------------------------
 
 def main():
+    from dotenv import load_dotenv
     load_dotenv()
 
     p = argparse.ArgumentParser()
@@ -321,6 +676,7 @@ def main():
     p.add_argument("--major", help="Intended major (not used in filter in this minimal prototype)")
     p.add_argument("--ipeds_csv", help="Path to IPEDS Admissions CSV (optional but recommended)")
     p.add_argument("--max_pages", type=int, default=None, help="Limit Scorecard pages to fetch (100 per page)")
+    p.add_argument("--snapshot", help="Score a saved school catalog (.csv/.json) instead of fetching; skips pandas/numpy")
     # Student inputs
     p.add_argument("--gpa", type=float)
     p.add_argument("--sat_ebrw", type=int)
@@ -337,14 +693,17 @@ def main():
     if interactive_needed:
         print("Interactive mode (press Enter to accept defaults).")
         api_key = args.api_key or os.getenv("API_KEY")
-        if not api_key:
+        if not api_key and not args.snapshot:
             api_key = _prompt_str("API key (or set API_KEY in .env)", required=True)
 
         state = args.state if args.state is not None else _prompt_str("State filter (e.g., CA) [optional]", default="")
         ownership = args.ownership if args.ownership is not None else _prompt_str("Ownership (1=Public, 2=Private nonprofit, 3=For-profit) [optional]", default="")
         major = args.major if args.major is not None else _prompt_str("Intended major [optional]", default="")
         ipeds_csv = args.ipeds_csv if args.ipeds_csv is not None else _prompt_str("Path to IPEDS Admissions CSV (e.g., ADM_2023.csv) [optional]", default="")
-        max_pages = args.max_pages if args.max_pages is not None else _prompt_int("Max pages from Scorecard (100 per page)", default=5, required=True, lo=1, hi=200)
+        if args.snapshot:
+            max_pages = args.max_pages
+        else:
+            max_pages = args.max_pages if args.max_pages is not None else _prompt_int("Max pages from Scorecard (100 per page)", default=5, required=True, lo=1, hi=200)
 
         gpa = args.gpa if args.gpa is not None else _prompt_float("GPA (0.0-4.0)", default=3.7, required=True, lo=0.0, hi=4.0)
         sat_ebrw = args.sat_ebrw if args.sat_ebrw is not None else _prompt_int("SAT EBRW (0-800)", default=650, required=True, lo=0, hi=800)
@@ -357,7 +716,7 @@ def main():
 
     else:
         api_key = args.api_key or os.getenv("API_KEY")
-        if not api_key:
+        if not api_key and not args.snapshot:
             print("Error: API key not provided. Use --api_key or set API_KEY in your .env", file=sys.stderr)
             sys.exit(1)
         state, ownership, major = args.state, args.ownership, args.major
@@ -367,24 +726,6 @@ def main():
         act, toefl, ap, ib = args.act or 0, args.toefl or 0, args.ap or 0, args.ib or 0
         out_json = args.out_json or "recommendations.json"
 
-    # 1) Fetch Scorecard
-    sc = fetch_scorecard(
-        api_key=api_key,
-        max_pages=max_pages,
-        state=state or None,
-        ownership=ownership or None,
-    )
-    if sc.empty:
-        print("No results from College Scorecard. Check filters or API key.", file=sys.stderr)
-        sys.exit(1)
-
-    # 2) Load IPEDS admissions (optional)
-    ipeds = load_ipeds_admissions(ipeds_csv if ipeds_csv else None)
-
-    # 3) Merge on UNITID
-    sc_renamed = sc.rename(columns={"id": "UNITID"})
-    merged = sc_renamed.merge(ipeds, on="UNITID", how="left") if ipeds is not None else sc_renamed.copy()
-
     # 4) Build student profile
     student = {
         "gpa": gpa,
@@ -396,13 +737,54 @@ def main():
         "major": major,
     }
 
-    # 5) Score & recommend
-    recs = recommend(merged, student, toefl_min=None, max_per_bucket=15)
+    if args.snapshot:
+        # Fast path: local snapshot scored by the pure-Python core.
+        # pandas is only imported when an IPEDS file has to be joined.
+        schools = load_snapshot_records(args.snapshot)
+        if state:
+            schools = [r for r in schools if r.get("school.state") == state]
+        if ownership:
+            # Numeric compare: pandas-written snapshots store the code as 1.0
+            wanted = _as_number(ownership)
+            schools = [r for r in schools
+                       if wanted is not None and _as_number(r.get("school.ownership")) == wanted]
+        if not schools:
+            print("No schools in snapshot. Check filters or snapshot file.", file=sys.stderr)
+            sys.exit(1)
+        ipeds = load_ipeds_admissions(ipeds_csv if ipeds_csv else None)
+        if ipeds is not None:
+            import pandas as pd
+            schools = join_ipeds(pd.DataFrame(schools), ipeds).to_dict("records")
+        else:
+            schools = [annotate_record_provenance(r) for r in schools]
+        recs = recommend_records(schools, student, max_per_bucket=15)
+        for rec in recs:
+            if "id" in rec:
+                rec["UNITID"] = rec.pop("id")
+    else:
+        # 1) Fetch Scorecard
+        sc = fetch_scorecard(
+            api_key=api_key,
+            max_pages=max_pages,
+            state=state or None,
+            ownership=ownership or None,
+        )
+        if sc.empty:
+            print("No results from College Scorecard. Check filters or API key.", file=sys.stderr)
+            sys.exit(1)
+
+        # 2) Load IPEDS admissions (optional)
+        ipeds = load_ipeds_admissions(ipeds_csv if ipeds_csv else None)
+
+        # 3) Merge on UNITID (in place, through a UNITID -> row index)
+        merged = join_ipeds(sc, ipeds) if ipeds is not None else annotate_band_provenance(sc)
+
+        # 5) Score & recommend
+        recs = recommend(merged, student, toefl_min=None, max_per_bucket=15)
 
-    # 6) Output
-    recs = recs.rename(columns={"id": "UNITID"})
+        # 6) Output
+        recs = dataframe_to_json(recs.rename(columns={"id": "UNITID"}))
     
-    # Convert DataFrame to JSON format
     json_data = {
         "student_profile": {
             "gpa": gpa,
@@ -415,13 +797,13 @@ def main():
             "ib_score": ib,
             "major": major
         },
-        "recommendations": dataframe_to_json(recs),
+        "recommendations": recs,
         "summary": {
             "total_recommendations": len(recs),
-            "reach_schools": len(recs[recs["bucket"] == "Reach"]),
-            "target_schools": len(recs[recs["bucket"] == "Target"]),
-            "likely_schools": len(recs[recs["bucket"] == "Likely"]),
-            "unknown_schools": len(recs[recs["bucket"] == "Unknown"])
+            "reach_schools": len([r for r in recs if r.get("bucket") == "Reach"]),
+            "target_schools": len([r for r in recs if r.get("bucket") == "Target"]),
+            "likely_schools": len([r for r in recs if r.get("bucket") == "Likely"]),
+            "unknown_schools": len([r for r in recs if r.get("bucket") == "Unknown"])
         }
     }
     
@@ -0,0 +1,81 @@
+"""Tests for ScoringBatcher: a malformed profile must only fail its own request."""
+
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+import numpy as np
+import pandas as pd
+import pytest
+
+import batching
+from batching import ScoringBatcher
+from prototype import score_students, top_per_bucket
+
+SCHOOLS = pd.DataFrame([
+    {"id": 1, "latest.admissions.admission_rate.overall": 0.05,
+     "latest.admissions.sat_scores.midpoint.math": 770,
+     "latest.admissions.sat_scores.midpoint.critical_reading": 750},
+    {"id": 2, "latest.admissions.admission_rate.overall": 0.45,
+     "latest.admissions.sat_scores.midpoint.math": 650,
+     "latest.admissions.sat_scores.midpoint.critical_reading": 630},
+    {"id": 3, "latest.admissions.admission_rate.overall": 0.85,
+     "latest.admissions.act_scores.midpoint.cumulative": 22},
+])
+
+VALID = [
+    {"gpa": 3.9, "sat_total": 1450, "act": 0},
+    {"gpa": 3.2, "sat_total": 1200, "act": 26},
+    {"gpa": 2.7, "satEBRW": 500, "satMath": 520, "act": 0},
+]
+MALFORMED = {"gpa": "3.9", "sat_total": 1450, "act": 0}
+
+
+def _submit_together(batcher, students):
+    """Queue every student within one batch window; return results or exceptions."""
+    barrier = threading.Barrier(len(students))
+
+    def call(student):
+        barrier.wait()
+        try:
+            return batcher.rank(student, SCHOOLS)
+        except Exception as e:
+            return e
+
+    with ThreadPoolExecutor(len(students)) as pool:
+        return list(pool.map(call, students))
+
+
+def _assert_ranked(result, student, k):
+    df, positions, scores = result
+    expected_pos, expected_scores = top_per_bucket(score_students(SCHOOLS, [student]), k)
+    assert df is SCHOOLS
+    np.testing.assert_array_equal(positions, expected_pos[0])
+    np.testing.assert_array_equal(scores, expected_scores[0])
+
+
+def test_malformed_profile_fails_only_its_request():
+    batcher = ScoringBatcher(lambda: SCHOOLS, window_ms=50, top_k=2)
+    results = _submit_together(batcher, VALID + [MALFORMED])
+
+    assert isinstance(results[-1], TypeError)
+    for result, student in zip(results, VALID):
+        _assert_ranked(result, student, 2)
+
+
+def test_failed_batch_is_retried_per_request(monkeypatch):
+    # A profile that slips past validation must not take the batch down with it
+    monkeypatch.setattr(batching, "student_inputs", lambda student: None)
+    batcher = ScoringBatcher(lambda: SCHOOLS, window_ms=50, top_k=2)
+    results = _submit_together(batcher, VALID + [MALFORMED])
+
+    assert isinstance(results[-1], TypeError)
+    for result, student in zip(results, VALID):
+        _assert_ranked(result, student, 2)
+    assert batcher.stats["failed_batches"] >= 1
+
+
+def test_malformed_profile_raises_before_queueing():
+    batcher = ScoringBatcher(lambda: SCHOOLS, window_ms=50)
+    with pytest.raises(TypeError):
+        batcher.rank(MALFORMED, SCHOOLS)
+    assert batcher.stats["requests"] == 0